@@ -6,10 +6,19 @@ import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib.image as mpimg
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+matplotlib.style.use('seaborn-v0_8')  # Apply the chart style once rather than per request
 import base64
 import io
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from functools import lru_cache
 from src.damage_classifier import DamageClassifier
 import logging
 
@@ -24,23 +33,135 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv'}
+ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
+
+# Damage level display settings, shared by every visualization
+DAMAGE_COLORS = {'LOW': 'green', 'MEDIUM': 'orange', 'HIGH': 'red'}
+GAUGE_ANGLES = {'LOW': 0.2, 'MEDIUM': np.pi/2, 'HIGH': 2.8}
 
 # Ensure upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-# Initialize damage classifier
-classifier = DamageClassifier()
+# Damage classifier, created on first use so importing the app stays cheap
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_classifier():
+    """Return the shared DamageClassifier, loading it on first use."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = DamageClassifier()
+    return _classifier
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
+
+def save_upload(file, filepath):
+    """Stream an uploaded file to disk in 1MB chunks and return its content hash."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'wb') as dst:
+        for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+            dst.write(chunk)
+    return digest.hexdigest()
+
+# Successful analyses of uploads, keyed by (content digest, path), least recently used first
+ANALYSIS_CACHE_SIZE = 32
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def _cached_analysis(digest, filepath):
+    """Return the classifier result for an upload; error results are never memoized."""
+    key = (digest, filepath)
+    with _analysis_cache_lock:
+        if key in _analysis_cache:
+            _analysis_cache.move_to_end(key)
+            return _analysis_cache[key]
+    
+    result = get_classifier().analyze_file(filepath)
+    
+    # A failed analysis may be transient, so let the next upload of these bytes retry
+    if 'error' not in result:
+        with _analysis_cache_lock:
+            _analysis_cache[key] = result
+            if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)
+    return result
+
+def analyze_upload(filepath, digest):
+    """Analyze an uploaded file, reusing the result when the same bytes are re-uploaded."""
+    # Copy so callers can attach extra keys without touching the cached entry
+    return dict(_cached_analysis(digest, filepath))
+
+def load_vibration_data(filepath):
+    """Load the first two vibration channels (columns starting with 'a') for plotting."""
+    # Read just the header to pick columns, so pandas parses only what gets plotted. Using
+    # pandas for the header too keeps blank-line/quoting/BOM rules identical to the data read.
+    header = pd.read_csv(filepath, nrows=0, engine='c').columns
+    vibration_idx = [i for i, col in enumerate(header) if str(col).startswith('a')][:2]
+    
+    df = pd.read_csv(filepath, usecols=vibration_idx, engine='c')
+    
+    # Non-numeric cells become NaN instead of failing the render; float32 is plenty for
+    # plotting and halves the memory the histograms scan
+    return df.apply(pd.to_numeric, errors='coerce').astype(np.float32)
+
+@lru_cache(maxsize=64)
+def render_upload(digest, filepath):
+    """Render the dashboard PNG for an uploaded file, cached like its analysis."""
+    df = load_vibration_data(filepath)
+    return create_visualization(df, _cached_analysis(digest, filepath))
+
+def render_gauge(level):
+    """Render the polar damage gauge for one level and return it as an RGBA image."""
+    fig = Figure(figsize=(7.5, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection='polar')
+    
+    theta = np.linspace(0, np.pi, 100)
+    r = np.ones_like(theta)
+    
+    ax.plot(theta, r, 'k-', linewidth=2)
+    ax.fill_between(theta, 0, r, alpha=0.3, color=DAMAGE_COLORS[level])
+    ax.set_ylim(0, 1)
+    ax.set_title(f'Damage Level: {level}', pad=20)
+    ax.set_yticks([])
+    ax.set_xticks([0, np.pi/2, np.pi])
+    ax.set_xticklabels(['LOW', 'MEDIUM', 'HIGH'])
+    
+    # Add arrow pointing to the level
+    ax.annotate('', xy=(GAUGE_ANGLES[level], 0.8), xytext=(np.pi/2, 0.3),
+                arrowprops=dict(arrowstyle='->', lw=3, color='black'))
+    
+    img_buffer = io.BytesIO()
+    fig.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
+    
+    img_buffer.seek(0)
+    return mpimg.imread(img_buffer)
+
+# There are only three gauge states, so render them once (on first use) instead of per request
+_gauge_images = None
+_gauge_images_lock = threading.Lock()
+
+def get_gauge_images():
+    """Return the gauge image for each damage level, rendering them on first use."""
+    global _gauge_images
+    if _gauge_images is None:
+        with _gauge_images_lock:
+            if _gauge_images is None:
+                _gauge_images = {level: render_gauge(level) for level in DAMAGE_COLORS}
+    return _gauge_images
 
 def create_visualization(df, analysis_result):
     """Create visualizations for the analysis."""
     
-    # Set style
-    plt.style.use('seaborn-v0_8')
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    # Figure + Agg canvas directly, bypassing pyplot's global figure registry
+    fig = Figure(figsize=(15, 10), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)
     fig.suptitle(f'Gearbox Analysis: {analysis_result["filename"]} - {analysis_result["damage_level"]} Damage', 
                  fontsize=16, fontweight='bold')
     
@@ -52,17 +173,23 @@ def create_visualization(df, analysis_result):
         sample_size = min(1000, len(df))
         sample_df = df.head(sample_size)
         
-        axes[0, 0].plot(sample_df.index, sample_df[vibration_cols[0]], label=vibration_cols[0], alpha=0.7)
-        axes[0, 0].plot(sample_df.index, sample_df[vibration_cols[1]], label=vibration_cols[1], alpha=0.7)
+        # One plot call over a 2-column array draws both channels with shared x data
+        lines = axes[0, 0].plot(sample_df.index.to_numpy(), sample_df[vibration_cols[:2]].to_numpy(), alpha=0.7)
         axes[0, 0].set_title('Vibration Time Series (First 1000 samples)')
         axes[0, 0].set_xlabel('Sample Index')
         axes[0, 0].set_ylabel('Amplitude')
-        axes[0, 0].legend()
+        axes[0, 0].legend(lines, vibration_cols[:2])
         axes[0, 0].grid(True, alpha=0.3)
         
         # Distribution plots
-        axes[0, 1].hist(df[vibration_cols[0]], bins=50, alpha=0.7, label=vibration_cols[0], density=True)
-        axes[0, 1].hist(df[vibration_cols[1]], bins=50, alpha=0.7, label=vibration_cols[1], density=True)
+        # Bin with NumPy and draw a single stepped path per channel instead of 50 bar patches
+        for col in vibration_cols[:2]:
+            values = df[col].to_numpy()
+            values = values[np.isfinite(values)]  # Drop missing samples, as Axes.hist did
+            if values.size == 0:
+                continue
+            counts, edges = np.histogram(values, bins=50, density=True)
+            axes[0, 1].stairs(counts, edges, fill=True, alpha=0.7, label=col)
         axes[0, 1].set_title('Amplitude Distribution')
         axes[0, 1].set_xlabel('Amplitude')
         axes[0, 1].set_ylabel('Density')
@@ -76,8 +203,7 @@ def create_visualization(df, analysis_result):
             feature_values = [features[name] for name in feature_names]
             
             bars = axes[1, 0].bar(range(len(feature_names)), feature_values, 
-                                 color=['red' if analysis_result['damage_level'] == 'HIGH' else 
-                                       'orange' if analysis_result['damage_level'] == 'MEDIUM' else 'green'])
+                                 color=DAMAGE_COLORS.get(analysis_result['damage_level'], 'green'))
             axes[1, 0].set_title('Key Features')
             axes[1, 0].set_xlabel('Features')
             axes[1, 0].set_ylabel('Value')
@@ -91,40 +217,19 @@ def create_visualization(df, analysis_result):
                                f'{value:.2f}', ha='center', va='bottom', fontsize=8)
         
         # Damage level indicator
-        damage_colors = {'LOW': 'green', 'MEDIUM': 'orange', 'HIGH': 'red'}
-        damage_scores = {'LOW': 25, 'MEDIUM': 50, 'HIGH': 85}
-        
         level = analysis_result['damage_level']
-        color = damage_colors[level]
-        score = damage_scores.get(level, 50)
-        
-        # Create a gauge-like chart
-        theta = np.linspace(0, np.pi, 100)
-        r = np.ones_like(theta)
-        
-        axes[1, 1] = plt.subplot(2, 2, 4, projection='polar')
-        axes[1, 1].plot(theta, r, 'k-', linewidth=2)
-        axes[1, 1].fill_between(theta, 0, r, alpha=0.3, color=color)
-        axes[1, 1].set_ylim(0, 1)
-        axes[1, 1].set_title(f'Damage Level: {level}', pad=20)
-        axes[1, 1].set_yticks([])
-        axes[1, 1].set_xticks([0, np.pi/2, np.pi])
-        axes[1, 1].set_xticklabels(['LOW', 'MEDIUM', 'HIGH'])
-        
-        # Add arrow pointing to current level
-        angle_map = {'LOW': 0.2, 'MEDIUM': np.pi/2, 'HIGH': 2.8}
-        arrow_angle = angle_map.get(level, np.pi/2)
-        axes[1, 1].annotate('', xy=(arrow_angle, 0.8), xytext=(np.pi/2, 0.3),
-                           arrowprops=dict(arrowstyle='->', lw=3, color='black'))
+        axes[1, 1].imshow(get_gauge_images()[level])
+        axes[1, 1].axis('off')
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Convert to base64 string
     img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
+    # tight_layout already fits the panels; skip the tight-bbox re-render and use fast zlib compression
+    canvas.print_png(img_buffer, pil_kwargs={'compress_level': 1, 'optimize': False})
     img_buffer.seek(0)
-    img_string = base64.b64encode(img_buffer.getvalue()).decode()
-    plt.close(fig)
+    # getbuffer() hands b64encode a zero-copy view of the PNG bytes
+    img_string = base64.b64encode(img_buffer.getbuffer()).decode('ascii')
     
     return img_string
 
@@ -148,17 +253,15 @@ def upload_file():
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            digest = save_upload(file, filepath)
             
             # Analyze the file
             try:
-                analysis_result = classifier.analyze_file(filepath)
+                analysis_result = analyze_upload(filepath, digest)
                 
                 # If analysis successful, create visualizations
                 if 'error' not in analysis_result:
-                    df = pd.read_csv(filepath)
-                    visualization = create_visualization(df, analysis_result)
-                    analysis_result['visualization'] = visualization
+                    analysis_result['visualization'] = render_upload(digest, filepath)
                 
                 return render_template('results.html', 
                                      result=analysis_result,
@@ -174,6 +277,58 @@ def upload_file():
     
     return render_template('upload.html')
 
+def analyze_processed_file(filepath):
+    """Analyze one processed file; runs in the batch pool or in-process as a fallback."""
+    try:
+        return get_classifier().analyze_file(filepath)
+    except Exception as e:
+        logger.error(f"Error analyzing {os.path.basename(filepath)}: {str(e)}")
+        return {'error': str(e)}
+
+# Batch workers are started from a forkserver so they are never forked from a threaded
+# server process. Where that isn't available (Windows can only spawn, re-importing the
+# whole app per worker), batches are analyzed in-process instead.
+BATCH_POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+BATCH_POOL_WORKERS = min(5, os.cpu_count() or 1)
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+def get_batch_pool():
+    """Return the long-lived batch analysis pool, creating it on first use (None if unsupported)."""
+    global _batch_pool
+    if BATCH_POOL_START_METHOD is None or BATCH_POOL_WORKERS < 2:
+        return None
+    if _batch_pool is None:
+        with _batch_pool_lock:
+            if _batch_pool is None:
+                _batch_pool = ProcessPoolExecutor(
+                    max_workers=BATCH_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context(BATCH_POOL_START_METHOD),
+                    initializer=get_classifier)
+    return _batch_pool
+
+def discard_batch_pool(pool):
+    """Drop a broken batch pool so the next request starts a fresh one."""
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is pool:
+            _batch_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def analyze_processed_files(filepaths):
+    """Analyze several processed files, in parallel when a batch pool is available."""
+    pool = get_batch_pool() if len(filepaths) > 1 else None
+    if pool is not None:
+        try:
+            return list(pool.map(analyze_processed_file, filepaths))
+        except Exception as e:
+            # e.g. BrokenProcessPool after a worker died; fall back to the sequential path
+            logger.error(f"Batch pool failed, analyzing sequentially: {str(e)}")
+            discard_batch_pool(pool)
+    
+    return [analyze_processed_file(filepath) for filepath in filepaths]
+
 @app.route('/analyze_existing')
 def analyze_existing():
     """Analyze existing processed files."""
@@ -190,15 +345,10 @@ def analyze_existing():
         flash('No processed CSV files found.')
         return redirect(url_for('index'))
     
-    results = []
-    for filename in csv_files[:5]:  # Limit to first 5 files
-        filepath = os.path.join(processed_dir, filename)
-        try:
-            analysis = classifier.analyze_file(filepath)
-            if 'error' not in analysis:
-                results.append(analysis)
-        except Exception as e:
-            logger.error(f"Error analyzing {filename}: {str(e)}")
+    filepaths = [os.path.join(processed_dir, f) for f in csv_files[:5]]  # Limit to first 5 files
+    
+    analyses = analyze_processed_files(filepaths)
+    results = [analysis for analysis in analyses if 'error' not in analysis]
     
     return render_template('batch_results.html', results=results)
 
@@ -219,9 +369,9 @@ def api_analyze():
     try:
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        digest = save_upload(file, filepath)
         
-        result = classifier.analyze_file(filepath)
+        result = analyze_upload(filepath, digest)
         return jsonify(result)
         
     except Exception as e:
@@ -231,4 +381,5 @@ if __name__ == '__main__':
     # Create templates directory if it doesn't exist
     os.makedirs('templates', exist_ok=True)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Threaded dev server so one long analysis doesn't block other requests; use gunicorn in production
+    app.run(host='0.0.0.0', port=5000, threaded=True, debug=False)
\ No newline at end of file